@@ -18,6 +18,7 @@ struct CliConfig {
     beta: f64,
     epsilon_bound: f64,
     recovery_delta: f64,
+    jobs: Option<usize>,
 }
 
 impl Default for CliConfig {
@@ -31,12 +32,18 @@ impl Default for CliConfig {
             beta: defaults.beta,
             epsilon_bound: defaults.epsilon_bound,
             recovery_delta: defaults.recovery_delta,
+            jobs: None,
         }
     }
 }
 
 fn main() -> Result<(), Box<dyn Error>> {
     let cli = parse_args(env::args().skip(1))?;
+    if let Some(jobs) = cli.jobs {
+        rayon::ThreadPoolBuilder::new()
+            .num_threads(jobs)
+            .build_global()?;
+    }
     let output_dir = create_output_dir()?;
     let config = MonteCarloConfig {
         n_runs: cli.runs,
@@ -86,6 +93,7 @@ where
             "--recovery-delta" => {
                 cli.recovery_delta = parse_value(args.next(), "--recovery-delta")?
             }
+            "--jobs" => cli.jobs = Some(parse_value(args.next(), "--jobs")?),
             "--help" | "-h" => {
                 print_help();
                 std::process::exit(0);
@@ -117,6 +125,7 @@ fn print_help() {
     println!("  --beta <f64>");
     println!("  --epsilon-bound <f64>");
     println!("  --recovery-delta <f64>");
+    println!("  --jobs <usize>            default: all available cores");
 }
 
 fn create_output_dir() -> Result<PathBuf, Box<dyn Error>> {
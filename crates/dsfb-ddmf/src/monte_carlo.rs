@@ -2,6 +2,7 @@ use std::collections::BTreeMap;
 
 use rand::rngs::StdRng;
 use rand::{Rng, SeedableRng};
+use rayon::prelude::*;
 use serde::Serialize;
 
 use crate::disturbances::DisturbanceKind;
@@ -85,43 +86,12 @@ pub struct TrajectoryRow {
 }
 
 pub fn run_monte_carlo(config: &MonteCarloConfig) -> MonteCarloBatch {
-    let mut rng = StdRng::seed_from_u64(config.seed);
-    let mut records = Vec::with_capacity(config.n_runs);
-
-    for run_id in 0..config.n_runs {
-        let disturbance_kind = sample_disturbance(&mut rng, config.n_steps);
-        let s0 = rng.gen_range(0.0..0.25);
-        let sim_config = SimulationConfig {
-            n_steps: config.n_steps,
-            rho: config.rho,
-            beta: config.beta,
-            disturbance_kind: disturbance_kind.clone(),
-            epsilon_bound: config.epsilon_bound,
-        };
-        let result = run_simulation_with_s0(&sim_config, s0);
-        let (d, b, s, impulse_start, impulse_len) = disturbance_kind.monte_carlo_columns();
-
-        records.push(MonteCarloRunRecord {
-            run_id,
-            regime_label: disturbance_kind.regime_label().to_string(),
-            disturbance_type: disturbance_kind.disturbance_type().to_string(),
-            admissible: disturbance_kind.is_admissible(),
-            d,
-            b,
-            s,
-            impulse_start,
-            impulse_len,
-            s0,
-            max_envelope: result.s.iter().copied().fold(0.0, f64::max),
-            min_trust: result.w.iter().copied().fold(1.0, f64::min),
-            time_to_recover: time_to_recover(
-                &disturbance_kind,
-                &result.s,
-                config.epsilon_bound,
-                config.recovery_delta,
-            ),
-        });
-    }
+    // Each run derives its own RNG from (seed, run_id), so the sweep stays
+    // reproducible regardless of how rayon schedules the runs across threads.
+    let records = (0..config.n_runs)
+        .into_par_iter()
+        .map(|run_id| sample_run(config, run_id))
+        .collect();
 
     MonteCarloBatch {
         records,
@@ -130,6 +100,42 @@ pub fn run_monte_carlo(config: &MonteCarloConfig) -> MonteCarloBatch {
     }
 }
 
+fn sample_run(config: &MonteCarloConfig, run_id: usize) -> MonteCarloRunRecord {
+    let mut rng = StdRng::seed_from_u64(config.seed.wrapping_add(run_id as u64));
+    let disturbance_kind = sample_disturbance(&mut rng, config.n_steps);
+    let s0 = rng.gen_range(0.0..0.25);
+    let sim_config = SimulationConfig {
+        n_steps: config.n_steps,
+        rho: config.rho,
+        beta: config.beta,
+        disturbance_kind: disturbance_kind.clone(),
+        epsilon_bound: config.epsilon_bound,
+    };
+    let result = run_simulation_with_s0(&sim_config, s0);
+    let (d, b, s, impulse_start, impulse_len) = disturbance_kind.monte_carlo_columns();
+
+    MonteCarloRunRecord {
+        run_id,
+        regime_label: disturbance_kind.regime_label().to_string(),
+        disturbance_type: disturbance_kind.disturbance_type().to_string(),
+        admissible: disturbance_kind.is_admissible(),
+        d,
+        b,
+        s,
+        impulse_start,
+        impulse_len,
+        s0,
+        max_envelope: result.s.iter().copied().fold(0.0, f64::max),
+        min_trust: result.w.iter().copied().fold(1.0, f64::min),
+        time_to_recover: time_to_recover(
+            &disturbance_kind,
+            &result.s,
+            config.epsilon_bound,
+            config.recovery_delta,
+        ),
+    }
+}
+
 pub fn summarize_batch(config: &MonteCarloConfig, batch: &MonteCarloBatch) -> MonteCarloSummary {
     let mut regime_counts = BTreeMap::new();
     let mut sum_max_envelope = 0.0;
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Precompile the summary kernel used by plot_sim_csv.py.
+
+The JIT kernel pays a compile cost on first call, which on small CSVs can
+exceed the speedup. On numba < 0.61 this script builds a dsfb_kernels
+extension with numba.pycc that imports instantly next to the scripts.
+numba 0.61 removed pycc (deprecated since 0.57) without a drop-in AOT
+replacement, so on newer versions the script instead compiles the
+cache=True JIT kernel once, populating numba's on-disk cache so later runs
+load machine code rather than compiling. Run from this directory:
+
+    python _compile_kernels.py
+
+plot_sim_csv prefers ``from dsfb_kernels import summarize``, then the JIT
+kernel, then plain numpy, so either precompile path (or none) is safe.
+"""
+
+import numpy as np
+
+
+def summarize(errors, i0, i1):
+    """Fused RMS + impulse-window peak over the stacked error rows.
+
+    Serial counterpart of the JIT kernel in plot_sim_csv.py; pycc does not
+    support parallel=True, but the AOT build removes per-run compile cost
+    entirely. Takes the float32 error matrix the loader produces and
+    accumulates in float64.
+    """
+    rows, n = errors.shape
+    rms = np.empty(rows)
+    peaks = np.empty(rows)
+    for r in range(rows):
+        acc = 0.0
+        for j in range(n):
+            acc += errors[r, j] * errors[r, j]
+        rms[r] = np.sqrt(acc / n)
+        peak = errors[r, i0]
+        for j in range(i0 + 1, i1):
+            if errors[r, j] > peak:
+                peak = errors[r, j]
+        peaks[r] = peak
+    return rms, peaks
+
+
+def build_aot_extension(CC) -> None:
+    cc = CC("dsfb_kernels")
+    cc.export("summarize", "UniTuple(f8[:], 2)(f4[:, :], i8, i8)")(summarize)
+    cc.compile()
+
+
+def warm_jit_cache() -> None:
+    """Compile the JIT kernel once so numba's on-disk cache serves later runs."""
+    import plot_sim_csv
+
+    kernel = plot_sim_csv._get_numba_summarize()
+    if kernel is None:
+        raise SystemExit(
+            "numba is not installed; nothing to precompile. "
+            "Install numba (pip install numba) and rerun, or skip this step: "
+            "plot_sim_csv falls back to plain numpy."
+        )
+    kernel(np.zeros((3, 4), dtype=np.float32), 1, 3)
+
+
+def main() -> None:
+    try:
+        from numba.pycc import CC
+    except ImportError:
+        print(
+            "numba.pycc is unavailable (deprecated in numba 0.57, removed in "
+            "0.61); warming the on-disk JIT cache instead."
+        )
+        warm_jit_cache()
+    else:
+        build_aot_extension(CC)
+
+
+if __name__ == "__main__":
+    main()
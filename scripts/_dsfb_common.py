@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Shared helpers for the DSFB plotting scripts.
+
+figure_error_plot.py, plot_sim_csv.py, and sim_plots.py consume the same
+simulation CSVs, so the run discovery, validated/cached loading, window
+bisection, and decimation logic live here once. Matplotlib is deliberately
+not imported: the scripts defer that cost themselves.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+REQUIRED_COLUMNS = [
+    "t",
+    "phi_true",
+    "phi_mean",
+    "phi_freqonly",
+    "phi_dsfb",
+    "err_mean",
+    "err_freqonly",
+    "err_dsfb",
+    "w2",
+    "s2",
+]
+
+
+def _latest_run_csv(run_dir: str, filename: str) -> Optional[str]:
+    """Newest timestamped run CSV by mtime, found in one scandir pass.
+
+    Avoids building and sorting the full candidate list a glob-based lookup
+    needs, and stats only one path per run directory.
+    """
+    best, best_mtime = None, -1.0
+    try:
+        entries = os.scandir(run_dir)
+    except FileNotFoundError:
+        return None
+    with entries:
+        for entry in entries:
+            path = os.path.join(entry.path, filename)
+            try:
+                mtime = os.stat(path).st_mtime
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            if mtime > best_mtime:
+                best, best_mtime = path, mtime
+    return best
+
+
+def resolve_csv_path(cli_csv: Optional[str] = None) -> str:
+    """Locate the simulation CSV: explicit path, newest run, then fallbacks."""
+    if cli_csv:
+        return cli_csv
+
+    for filename in ("sim-dsfb.csv", "sim.csv"):
+        candidate = _latest_run_csv("output-dsfb", filename)
+        if candidate:
+            return candidate
+
+    static_candidates = [
+        Path("output-dsfb/sim-dsfb.csv"),
+        Path("sim-dsfb.csv"),
+        Path("output-dsfb/sim.csv"),
+        Path("sim.csv"),
+        Path("out/sim.csv"),
+    ]
+    for candidate in static_candidates:
+        if candidate.exists():
+            return str(candidate)
+
+    raise FileNotFoundError(
+        "Could not find DSFB simulation CSV. Expected sim-dsfb.csv or "
+        "output-dsfb/<timestamp>/sim-dsfb.csv; generate one with: "
+        "cargo run --release -p dsfb --example drift_impulse"
+    )
+
+
+def validate_header(csv_path: str) -> None:
+    """Check the full schema from the header row alone, before any data parse."""
+    header = pd.read_csv(csv_path, nrows=0)
+    missing = [c for c in REQUIRED_COLUMNS if c not in header.columns]
+    if missing:
+        raise ValueError(
+            f"Missing required columns in {csv_path}: {', '.join(missing)}"
+        )
+
+
+def load_table(
+    csv_path: str,
+    columns: List[str],
+    dtypes: Optional[Dict[str, type]] = None,
+) -> pd.DataFrame:
+    """Validated, projected read of a simulation CSV.
+
+    A Parquet sidecar written on first parse lets every later run (of any of
+    the plotting scripts) skip text-to-float conversion. The sidecar holds
+    all validated columns so each script can project its own subset; the
+    mtime check invalidates it when the CSV is rerun.
+    """
+    validate_header(csv_path)
+    dtypes = dtypes or {}
+    try:
+        parquet_path = Path(csv_path).with_suffix(".parquet")
+        if (
+            parquet_path.exists()
+            and parquet_path.stat().st_mtime >= Path(csv_path).stat().st_mtime
+        ):
+            # astype is a no-op for sidecars already written in these dtypes.
+            return pd.read_parquet(parquet_path, columns=columns).astype(dtypes)
+
+        df = pd.read_csv(csv_path, engine="pyarrow", dtype=dtypes)
+        df.to_parquet(parquet_path, compression="zstd", index=False)
+        return df[columns]
+    except ImportError:
+        # pyarrow not installed; the C engine still benefits from projection.
+        return pd.read_csv(csv_path, usecols=columns, dtype=dtypes, engine="c")
+
+
+def impulse_slice(t: np.ndarray, lo: float, hi: float) -> Tuple[int, int]:
+    """Bisect the contiguous [lo, hi] window on the monotonic time axis.
+
+    Returns the half-open index range; callers decide how to report an empty
+    window. Raises when t is not monotonically increasing, which bisection
+    silently miscomputes on.
+    """
+    if not np.all(np.diff(t) >= 0.0):
+        raise ValueError("CSV column 't' must be monotonically increasing")
+    i0 = int(np.searchsorted(t, lo, side="left"))
+    i1 = int(np.searchsorted(t, hi, side="right"))
+    return i0, i1
+
+
+def decimate_minmax(
+    x: np.ndarray, y: np.ndarray, target: int = 2000
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Bucketed min/max decimation that preserves the visual envelope.
+
+    Each bucket contributes its minimum and maximum, so spikes survive while
+    the number of line segments Matplotlib rasterizes stays bounded. Series
+    short enough to draw directly are returned untouched.
+    """
+    if len(x) <= 2 * target:
+        return x, y
+
+    starts = np.linspace(0, len(x), target + 1, dtype=int)[:-1]
+    xs = np.repeat(x[starts], 2)
+    ys = np.empty(xs.size, dtype=y.dtype)
+    ys[0::2] = np.minimum.reduceat(y, starts)
+    ys[1::2] = np.maximum.reduceat(y, starts)
+    return xs, ys
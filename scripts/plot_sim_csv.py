@@ -4,26 +4,31 @@
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import os
-from pathlib import Path
-from typing import Dict, Optional
+import sys
+from typing import Dict
 
-import matplotlib.pyplot as plt
+import matplotlib
 import numpy as np
 import pandas as pd
 
-REQUIRED_COLUMNS = [
-    "t",
-    "phi_true",
-    "phi_mean",
-    "phi_freqonly",
-    "phi_dsfb",
-    "err_mean",
-    "err_freqonly",
-    "err_dsfb",
-    "w2",
-    "s2",
-]
+from _dsfb_common import (
+    decimate_minmax,
+    impulse_slice,
+    load_table,
+    resolve_csv_path,
+    validate_header,
+)
+
+# Only these columns feed the summary statistics and plots; the phi_* columns
+# are validated but never parsed.
+PLOT_COLUMNS = ["t", "err_mean", "err_freqonly", "err_dsfb", "w2", "s2"]
+
+# The plots render at screen resolution and the reductions accumulate in
+# float64, so float32 storage halves memory traffic end to end. t stays
+# float64 to keep the searchsorted time axis at full precision.
+PLOT_DTYPES = {c: np.float32 for c in PLOT_COLUMNS if c != "t"}
 
 
 def parse_args() -> argparse.Namespace:
@@ -59,11 +64,22 @@ def parse_args() -> argparse.Namespace:
         default=4.0,
         help="Zoom plot end time",
     )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Compute summary statistics in constant memory via chunked CSV "
+        "reads and skip plotting (for CSVs too large to load whole)",
+    )
     parser.add_argument(
         "--save-plots",
         action="store_true",
         help="Save plots as PNG files in --outdir",
     )
+    parser.add_argument(
+        "--individual-plots",
+        action="store_true",
+        help="Also save each panel as its own PNG (implies --save-plots layout)",
+    )
     parser.add_argument(
         "--outdir",
         default=".",
@@ -72,71 +88,139 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def load_data(csv_path: str) -> pd.DataFrame:
-    df = pd.read_csv(csv_path)
-    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
-    if missing:
-        raise ValueError(f"CSV missing required columns: {', '.join(missing)}")
-    return df
-
-
-def resolve_csv_path(cli_csv: Optional[str]) -> str:
-    if cli_csv:
-        return cli_csv
-
-    run_candidates = sorted(Path("output-dsfb").glob("*/sim-dsfb.csv"))
-    if run_candidates:
-        return str(run_candidates[-1])
-
-    run_candidates = sorted(Path("output-dsfb").glob("*/sim.csv"))
-    if run_candidates:
-        return str(run_candidates[-1])
-
-    static_candidates = [
-        Path("output-dsfb/sim-dsfb.csv"),
-        Path("sim-dsfb.csv"),
-        Path("output-dsfb/sim.csv"),
-        Path("sim.csv"),
-        Path("out/sim.csv"),
-    ]
-    for candidate in static_candidates:
-        if candidate.exists():
-            return str(candidate)
-
-    raise FileNotFoundError(
-        "Could not find DSFB simulation CSV. Provide --csv or generate output-dsfb/<timestamp>/sim-dsfb.csv "
-        "with: cargo run --release -p dsfb --example drift_impulse"
-    )
-
-
-def rms(series: pd.Series) -> float:
-    values = series.to_numpy(dtype=float)
-    return float(np.sqrt(np.mean(values**2)))
+# Lazily compiled numba kernel; False means numba is unavailable and the
+# numpy path should be used, None means compilation has not been attempted.
+_NUMBA_SUMMARIZE = None
+
+
+def _get_numba_summarize():
+    """Compile the fused RMS + windowed-peak kernel on first use.
+
+    One parallel pass per error row accumulates the sum of squares and the
+    impulse-window peak together, so large runs reduce at streaming bandwidth
+    instead of making separate einsum and max passes. Returns None when numba
+    is not installed; the compiled kernel is cached for the process lifetime.
+    """
+    global _NUMBA_SUMMARIZE
+    if _NUMBA_SUMMARIZE is None:
+        try:
+            # Prebuilt AOT extension (see _compile_kernels.py): imports
+            # instantly with no JIT warm-up at all.
+            from dsfb_kernels import summarize as aot_summarize
+        except ImportError:
+            pass
+        else:
+            _NUMBA_SUMMARIZE = aot_summarize
+            return _NUMBA_SUMMARIZE
+        try:
+            import numba
+        except ImportError:
+            _NUMBA_SUMMARIZE = False
+        else:
+
+            @numba.njit(cache=True, parallel=True, fastmath=True)
+            def summarize(errors, i0, i1):
+                rows, n = errors.shape
+                rms = np.empty(rows)
+                peaks = np.empty(rows)
+                for r in numba.prange(rows):
+                    acc = 0.0
+                    for j in range(n):
+                        acc += errors[r, j] * errors[r, j]
+                    rms[r] = np.sqrt(acc / n)
+                    peak = errors[r, i0]
+                    for j in range(i0 + 1, i1):
+                        if errors[r, j] > peak:
+                            peak = errors[r, j]
+                    peaks[r] = peak
+                return rms, peaks
+
+            _NUMBA_SUMMARIZE = summarize
+    return _NUMBA_SUMMARIZE or None
 
 
 def compute_summary(
     df: pd.DataFrame, impulse_start: float, impulse_end: float
 ) -> Dict[str, Dict[str, float]]:
-    impulse_mask = (df["t"] >= impulse_start) & (df["t"] <= impulse_end)
-    if not impulse_mask.any():
+    t = df["t"].to_numpy()
+    i0, i1 = impulse_slice(t, impulse_start, impulse_end)
+    if i1 <= i0:
         raise ValueError(
             "No rows found inside the impulse window. "
             "Adjust --impulse-start/--impulse-end."
         )
 
+    # Stack the three error series once so RMS and the impulse peak each run
+    # as a single axis=1 reduction instead of six separate masked scans.
+    errors = np.vstack(
+        [df[col].to_numpy() for col in ("err_mean", "err_freqonly", "err_dsfb")]
+    )
+    # Only long runs amortize numba's compile/warm-up cost; short ones stay
+    # on the numpy reductions.
+    summarize = _get_numba_summarize() if errors.shape[1] > 200_000 else None
+    if summarize is not None:
+        rms_values, peaks = summarize(errors, i0, i1)
+    else:
+        # Accumulate in float64 even when the inputs are float32.
+        rms_values = np.sqrt(
+            np.einsum("ij,ij->i", errors, errors, dtype=np.float64)
+            / errors.shape[1]
+        )
+        peaks = errors[:, i0:i1].max(axis=1)
+
     return {
-        "mean": {
-            "rms": rms(df["err_mean"]),
-            "peak_impulse": float(df.loc[impulse_mask, "err_mean"].max()),
-        },
-        "freqonly": {
-            "rms": rms(df["err_freqonly"]),
-            "peak_impulse": float(df.loc[impulse_mask, "err_freqonly"].max()),
-        },
-        "dsfb": {
-            "rms": rms(df["err_dsfb"]),
-            "peak_impulse": float(df.loc[impulse_mask, "err_dsfb"].max()),
-        },
+        method: {"rms": float(rms_values[i]), "peak_impulse": float(peaks[i])}
+        for i, method in enumerate(("mean", "freqonly", "dsfb"))
+    }
+
+
+def compute_summary_streaming(
+    csv_path: str, impulse_start: float, impulse_end: float
+) -> Dict[str, Dict[str, float]]:
+    """Chunked-read variant of compute_summary with constant memory.
+
+    Accumulates the sum of squares and the impulse-window peak across
+    200k-row blocks, so multi-GB CSVs reduce without ever being resident.
+    Only the summary is produced; plotting needs the full series in memory.
+    """
+    validate_header(csv_path)
+
+    err_cols = ["err_mean", "err_freqonly", "err_dsfb"]
+    sum_squares = np.zeros(3)
+    peaks = np.full(3, -np.inf)
+    total = 0
+    prev_t = -np.inf
+    for chunk in pd.read_csv(
+        csv_path,
+        usecols=["t"] + err_cols,
+        dtype={c: np.float32 for c in err_cols},
+        chunksize=200_000,
+        engine="c",
+    ):
+        t = chunk["t"].to_numpy()
+        if t[0] < prev_t or not np.all(np.diff(t) >= 0.0):
+            raise ValueError("CSV column 't' must be monotonically increasing")
+        prev_t = t[-1]
+
+        errors = chunk[err_cols].to_numpy().T
+        sum_squares += np.einsum("ij,ij->i", errors, errors, dtype=np.float64)
+        total += errors.shape[1]
+
+        i0 = np.searchsorted(t, impulse_start, side="left")
+        i1 = np.searchsorted(t, impulse_end, side="right")
+        if i1 > i0:
+            peaks = np.maximum(peaks, errors[:, i0:i1].max(axis=1))
+
+    if not np.all(np.isfinite(peaks)):
+        raise ValueError(
+            "No rows found inside the impulse window. "
+            "Adjust --impulse-start/--impulse-end."
+        )
+
+    rms_values = np.sqrt(sum_squares / total)
+    return {
+        method: {"rms": float(rms_values[i]), "peak_impulse": float(peaks[i])}
+        for i, method in enumerate(("mean", "freqonly", "dsfb"))
     }
 
 
@@ -153,35 +237,74 @@ def print_summary(stats: Dict[str, Dict[str, float]], start: float, end: float)
         )
 
 
-def maybe_save(fig: plt.Figure, path: str, enabled: bool) -> None:
+def maybe_save(fig: matplotlib.figure.Figure, path: str, enabled: bool) -> None:
     if enabled:
         fig.savefig(path, dpi=200, bbox_inches="tight")
 
 
+def render_panel(spec: dict) -> str:
+    """Render one standalone panel in a worker process.
+
+    Workers force Agg before touching pyplot, draw only the arrays shipped in
+    the spec, and write the PNG themselves, so four panels render on four
+    cores with a small pickling payload.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.rcParams["font.family"] = "DejaVu Sans"
+    fig, ax = plt.subplots(figsize=(10, 4.8))
+    for line in spec["lines"]:
+        ax.plot(line["x"], line["y"], label=line["label"], **line.get("style", {}))
+    if spec.get("xlim") is not None:
+        ax.set_xlim(*spec["xlim"])
+    ax.set_title(spec["title"])
+    ax.set_xlabel(spec["xlabel"])
+    ax.set_ylabel(spec["ylabel"])
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    fig.savefig(spec["path"], dpi=200, bbox_inches="tight")
+    plt.close(fig)
+    return spec["path"]
+
+
 def plot_all(
     df: pd.DataFrame,
     zoom_start: float,
     zoom_end: float,
     save_plots: bool,
     outdir: str,
+    individual_plots: bool = False,
 ) -> None:
+    import matplotlib.pyplot as plt
+
+    # A face bundled with Matplotlib: avoids system font scans.
+    plt.rcParams["font.family"] = "DejaVu Sans"
+
     if save_plots:
         os.makedirs(outdir, exist_ok=True)
 
-    # 1) Estimation errors over full time.
-    fig1, ax1 = plt.subplots(figsize=(10, 4.8))
-    ax1.plot(df["t"], df["err_mean"], label="err_mean", linewidth=1.7)
-    ax1.plot(df["t"], df["err_freqonly"], label="err_freqonly", linewidth=1.7)
-    ax1.plot(df["t"], df["err_dsfb"], label="err_dsfb", linewidth=1.9)
+    # One shared 2x2 grid costs a single figure setup and a single encode
+    # pass instead of four of each.
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(
+        2, 2, figsize=(20, 9.6), constrained_layout=True
+    )
+
+    # 1) Estimation errors over full time (decimated: the full-range panel
+    # cannot resolve more vertices than the decimation target anyway).
+    t = df["t"].to_numpy()
+    ax1.plot(*decimate_minmax(t, df["err_mean"].to_numpy()), label="err_mean", linewidth=1.7)
+    ax1.plot(*decimate_minmax(t, df["err_freqonly"].to_numpy()), label="err_freqonly", linewidth=1.7)
+    ax1.plot(*decimate_minmax(t, df["err_dsfb"].to_numpy()), label="err_dsfb", linewidth=1.9)
     ax1.set_title("Estimation Error vs Time")
     ax1.set_xlabel("t")
     ax1.set_ylabel("Absolute Error")
     ax1.grid(True, alpha=0.3)
     ax1.legend()
-    maybe_save(fig1, os.path.join(outdir, "estimation_error_vs_time.png"), save_plots)
 
     # 2) Zoomed estimation error.
-    fig2, ax2 = plt.subplots(figsize=(10, 4.8))
     ax2.plot(df["t"], df["err_mean"], label="err_mean", linewidth=1.7)
     ax2.plot(df["t"], df["err_freqonly"], label="err_freqonly", linewidth=1.7)
     ax2.plot(df["t"], df["err_dsfb"], label="err_dsfb", linewidth=1.9)
@@ -191,41 +314,126 @@ def plot_all(
     ax2.set_ylabel("Absolute Error")
     ax2.grid(True, alpha=0.3)
     ax2.legend()
-    maybe_save(fig2, os.path.join(outdir, "estimation_error_zoom.png"), save_plots)
 
     # 3) Trust weight w2.
-    fig3, ax3 = plt.subplots(figsize=(10, 4.8))
     ax3.plot(df["t"], df["w2"], label="w2", color="tab:blue", linewidth=1.8)
     ax3.set_title("Trust Weight w2 vs Time")
     ax3.set_xlabel("t")
     ax3.set_ylabel("w2")
     ax3.grid(True, alpha=0.3)
     ax3.legend()
-    maybe_save(fig3, os.path.join(outdir, "trust_weight_w2.png"), save_plots)
 
     # 4) EMA residual s2.
-    fig4, ax4 = plt.subplots(figsize=(10, 4.8))
     ax4.plot(df["t"], df["s2"], label="s2", color="tab:orange", linewidth=1.8)
     ax4.set_title("EMA Residual s2 vs Time")
     ax4.set_xlabel("t")
     ax4.set_ylabel("s2")
     ax4.grid(True, alpha=0.3)
     ax4.legend()
-    maybe_save(fig4, os.path.join(outdir, "ema_residual_s2.png"), save_plots)
 
-    plt.show()
+    maybe_save(fig, os.path.join(outdir, "sim_overview.png"), save_plots)
+
+    if save_plots and individual_plots:
+        # Each panel reads disjoint columns and writes a distinct file, so
+        # render the standalone versions concurrently in Agg workers, passing
+        # each one only the arrays it draws.
+        err_series = [
+            ("err_mean", df["err_mean"].to_numpy(), 1.7),
+            ("err_freqonly", df["err_freqonly"].to_numpy(), 1.7),
+            ("err_dsfb", df["err_dsfb"].to_numpy(), 1.9),
+        ]
+        specs = [
+            {
+                "title": "Estimation Error vs Time",
+                "xlabel": "t",
+                "ylabel": "Absolute Error",
+                "path": os.path.join(outdir, "estimation_error_vs_time.png"),
+                "lines": [
+                    {"label": label, "style": {"linewidth": lw}}
+                    | dict(zip(("x", "y"), decimate_minmax(t, values)))
+                    for label, values, lw in err_series
+                ],
+            },
+            {
+                "title": f"Zoomed Estimation Error (t in [{zoom_start:.2f}, {zoom_end:.2f}])",
+                "xlabel": "t",
+                "ylabel": "Absolute Error",
+                "xlim": (zoom_start, zoom_end),
+                "path": os.path.join(outdir, "estimation_error_zoom.png"),
+                "lines": [
+                    {"label": label, "x": t, "y": values, "style": {"linewidth": lw}}
+                    for label, values, lw in err_series
+                ],
+            },
+            {
+                "title": "Trust Weight w2 vs Time",
+                "xlabel": "t",
+                "ylabel": "w2",
+                "path": os.path.join(outdir, "trust_weight_w2.png"),
+                "lines": [
+                    {
+                        "label": "w2",
+                        "x": t,
+                        "y": df["w2"].to_numpy(),
+                        "style": {"color": "tab:blue", "linewidth": 1.8},
+                    }
+                ],
+            },
+            {
+                "title": "EMA Residual s2 vs Time",
+                "xlabel": "t",
+                "ylabel": "s2",
+                "path": os.path.join(outdir, "ema_residual_s2.png"),
+                "lines": [
+                    {
+                        "label": "s2",
+                        "x": t,
+                        "y": df["s2"].to_numpy(),
+                        "style": {"color": "tab:orange", "linewidth": 1.8},
+                    }
+                ],
+            },
+        ]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=4) as pool:
+            list(pool.map(render_panel, specs))
+
+    # Only open a window when one could actually appear.
+    if sys.stdout.isatty() and matplotlib.get_backend().lower() != "agg":
+        plt.show()
 
 
 def main() -> int:
     args = parse_args()
+
+    # Select the backend before pyplot is first imported: batch runs never
+    # need a GUI, and Agg skips backend discovery and GUI library loads.
+    if args.save_plots or os.environ.get("DISPLAY") is None:
+        matplotlib.use("Agg")
+
     csv_path = resolve_csv_path(args.csv)
-    df = load_data(csv_path)
+
+    if args.streaming:
+        stats = compute_summary_streaming(
+            csv_path, args.impulse_start, args.impulse_end
+        )
+        print_summary(stats, args.impulse_start, args.impulse_end)
+        print(f"\nUsing CSV: {os.path.abspath(csv_path)}")
+        return 0
+
+    df = load_table(csv_path, PLOT_COLUMNS, PLOT_DTYPES)
 
     stats = compute_summary(df, args.impulse_start, args.impulse_end)
     print_summary(stats, args.impulse_start, args.impulse_end)
     print(f"\nUsing CSV: {os.path.abspath(csv_path)}")
 
-    plot_all(df, args.zoom_start, args.zoom_end, args.save_plots, args.outdir)
+    plot_all(
+        df,
+        args.zoom_start,
+        args.zoom_end,
+        args.save_plots,
+        args.outdir,
+        args.individual_plots,
+    )
 
     if args.save_plots:
         print(f"\nSaved PNG files to: {os.path.abspath(args.outdir)}")
@@ -1,73 +1,53 @@
 #!/usr/bin/env python3
 
+import os
+import sys
+
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-from pathlib import Path
+import matplotlib
 
-ZOOM_MIN, ZOOM_MAX = 3.6, 4.0
-IMPULSE_MIN, IMPULSE_MAX = 3.0, 4.0
+from _dsfb_common import impulse_slice, load_table, resolve_csv_path
 
-REQUIRED_COLUMNS = [
-    "t", "phi_true", "phi_mean", "phi_freqonly", "phi_dsfb",
-    "err_mean", "err_freqonly", "err_dsfb", "w2", "s2"
-]
-
-def resolve_csv_path() -> str:
-    run_candidates = sorted(Path("output-dsfb").glob("*/sim-dsfb.csv"))
-    if run_candidates:
-        return str(run_candidates[-1])
-
-    run_candidates = sorted(Path("output-dsfb").glob("*/sim.csv"))
-    if run_candidates:
-        return str(run_candidates[-1])
-
-    static_candidates = [
-        Path("output-dsfb/sim-dsfb.csv"),
-        Path("sim-dsfb.csv"),
-        Path("output-dsfb/sim.csv"),
-        Path("sim.csv"),
-        Path("out/sim.csv"),
-    ]
-    for candidate in static_candidates:
-        if candidate.exists():
-            return str(candidate)
-
-    raise FileNotFoundError(
-        "Could not find DSFB simulation CSV. Expected sim-dsfb.csv or output-dsfb/<timestamp>/sim-dsfb.csv."
-    )
+# Select the backend before pyplot is imported: headless runs never need a
+# GUI, and Agg skips backend discovery and GUI library loads.
+if os.environ.get("DISPLAY") is None:
+    matplotlib.use("Agg")
 
-CSV_PATH = resolve_csv_path()
+ZOOM_MIN, ZOOM_MAX = 3.6, 4.0
+IMPULSE_MIN, IMPULSE_MAX = 3.0, 4.0
 
-df = pd.read_csv(CSV_PATH)
+# Only these columns feed the statistics and plots below; the phi_* columns
+# are validated but never parsed.
+PLOT_COLUMNS = ["t", "err_mean", "err_freqonly", "err_dsfb", "w2", "s2"]
 
-missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
-if missing:
-    raise ValueError(f"Missing required columns in {CSV_PATH}: {missing}")
+# float32 storage halves memory traffic; the reductions below accumulate in
+# float64, and t stays float64 for the searchsorted time axis.
+PLOT_DTYPES = {c: np.float32 for c in PLOT_COLUMNS if c != "t"}
 
+CSV_PATH = resolve_csv_path()
+df = load_table(CSV_PATH, PLOT_COLUMNS, PLOT_DTYPES)
 
-def rms(x: pd.Series) -> float:
-    a = x.to_numpy(dtype=float)
-    return float(np.sqrt(np.mean(a ** 2)))
 
+# Bind the ndarrays once; all statistics and plotting below reuse these
+# views instead of repeating the Series lookup per use.
+t, em, ef, ed, w2, s2 = (df[c].to_numpy() for c in PLOT_COLUMNS)
 
-impulse_mask = (df["t"] >= IMPULSE_MIN) & (df["t"] <= IMPULSE_MAX)
-if not impulse_mask.any():
+i0, i1 = impulse_slice(t, IMPULSE_MIN, IMPULSE_MAX)
+if i1 <= i0:
     raise ValueError(f"No samples in impulse window [{IMPULSE_MIN}, {IMPULSE_MAX}]")
 
+# Stack the three error series once so RMS and the impulse peak each run as a
+# single axis=1 reduction instead of six separate masked scans.
+errors = np.vstack([em, ef, ed])
+# Accumulate in float64 even when the inputs are float32.
+rms_values = np.sqrt(
+    np.einsum("ij,ij->i", errors, errors, dtype=np.float64) / errors.shape[1]
+)
+peaks = errors[:, i0:i1].max(axis=1)
+
 stats = {
-    "mean": {
-        "rms": rms(df["err_mean"]),
-        "peak_impulse": float(df.loc[impulse_mask, "err_mean"].max()),
-    },
-    "freqonly": {
-        "rms": rms(df["err_freqonly"]),
-        "peak_impulse": float(df.loc[impulse_mask, "err_freqonly"].max()),
-    },
-    "dsfb": {
-        "rms": rms(df["err_dsfb"]),
-        "peak_impulse": float(df.loc[impulse_mask, "err_dsfb"].max()),
-    },
+    method: {"rms": float(rms_values[i]), "peak_impulse": float(peaks[i])}
+    for i, method in enumerate(("mean", "freqonly", "dsfb"))
 }
 
 print("Summary Statistics")
@@ -77,53 +57,67 @@ print(f"{'method':<10}{'RMS error':>14}{'Peak impulse error':>22}")
 for m in ("mean", "freqonly", "dsfb"):
     print(f"{m:<10}{stats[m]['rms']:>14.6f}{stats[m]['peak_impulse']:>22.6f}")
 
+# pyplot (and its font discovery) only loads once the CSV has parsed and the
+# statistics have printed, so validation failures never pay the import cost.
+# The pinned font is bundled with Matplotlib, avoiding system font scans.
+import matplotlib.pyplot as plt
+
+plt.rcParams["font.family"] = "DejaVu Sans"
+
+# One shared 2x2 grid costs a single figure setup and render; the four
+# existing per-panel PNGs are cropped out of it below.
+fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(
+    2, 2, figsize=(20, 9.6), constrained_layout=True
+)
+
 # 1) Estimation error vs time
-fig1, ax1 = plt.subplots(figsize=(10, 4.8))
-ax1.plot(df["t"], df["err_mean"], label="err_mean", linewidth=1.8)
-ax1.plot(df["t"], df["err_freqonly"], label="err_freqonly", linewidth=1.8)
-ax1.plot(df["t"], df["err_dsfb"], label="err_dsfb", linewidth=1.8)
+ax1.plot(t, em, label="err_mean", linewidth=1.8)
+ax1.plot(t, ef, label="err_freqonly", linewidth=1.8)
+ax1.plot(t, ed, label="err_dsfb", linewidth=1.8)
 ax1.set_title("Estimation Error vs Time")
 ax1.set_xlabel("t")
 ax1.set_ylabel("Absolute Error")
 ax1.grid(True, alpha=0.3)
 ax1.legend()
-fig1.tight_layout()
-fig1.savefig("estimation_error_vs_time.png", dpi=300, bbox_inches="tight")
 
 # 2) Zoomed-in estimation error
-fig2, ax2 = plt.subplots(figsize=(10, 4.8))
-ax2.plot(df["t"], df["err_mean"], label="err_mean", linewidth=1.8)
-ax2.plot(df["t"], df["err_freqonly"], label="err_freqonly", linewidth=1.8)
-ax2.plot(df["t"], df["err_dsfb"], label="err_dsfb", linewidth=1.8)
+ax2.plot(t, em, label="err_mean", linewidth=1.8)
+ax2.plot(t, ef, label="err_freqonly", linewidth=1.8)
+ax2.plot(t, ed, label="err_dsfb", linewidth=1.8)
 ax2.set_xlim(ZOOM_MIN, ZOOM_MAX)
 ax2.set_title(f"Estimation Error (Zoomed), t in [{ZOOM_MIN}, {ZOOM_MAX}]")
 ax2.set_xlabel("t")
 ax2.set_ylabel("Absolute Error")
 ax2.grid(True, alpha=0.3)
 ax2.legend()
-fig2.tight_layout()
-fig2.savefig("estimation_error_zoom.png", dpi=300, bbox_inches="tight")
 
 # 3) Trust weight w2 vs time
-fig3, ax3 = plt.subplots(figsize=(10, 4.8))
-ax3.plot(df["t"], df["w2"], label="w2", color="tab:blue", linewidth=1.8)
+ax3.plot(t, w2, label="w2", color="tab:blue", linewidth=1.8)
 ax3.set_title("Trust Weight w2 vs Time")
 ax3.set_xlabel("t")
 ax3.set_ylabel("w2")
 ax3.grid(True, alpha=0.3)
 ax3.legend()
-fig3.tight_layout()
-fig3.savefig("trust_weight_w2.png", dpi=300, bbox_inches="tight")
 
 # 4) EMA residual s2 vs time
-fig4, ax4 = plt.subplots(figsize=(10, 4.8))
-ax4.plot(df["t"], df["s2"], label="s2", color="tab:orange", linewidth=1.8)
+ax4.plot(t, s2, label="s2", color="tab:orange", linewidth=1.8)
 ax4.set_title("EMA Residual s2 vs Time")
 ax4.set_xlabel("t")
 ax4.set_ylabel("s2")
 ax4.grid(True, alpha=0.3)
 ax4.legend()
-fig4.tight_layout()
-fig4.savefig("ema_residual_s2.png", dpi=300, bbox_inches="tight")
 
-plt.show()
+fig.canvas.draw()
+renderer = fig.canvas.get_renderer()
+for axis, filename in (
+    (ax1, "estimation_error_vs_time.png"),
+    (ax2, "estimation_error_zoom.png"),
+    (ax3, "trust_weight_w2.png"),
+    (ax4, "ema_residual_s2.png"),
+):
+    extent = axis.get_tightbbox(renderer).transformed(fig.dpi_scale_trans.inverted())
+    fig.savefig(filename, dpi=300, bbox_inches=extent)
+
+# Only open a window when one could actually appear.
+if sys.stdout.isatty() and matplotlib.get_backend().lower() != "agg":
+    plt.show()